@@ -1,26 +1,89 @@
 import json
 import os
+import hashlib
+import heapq
+import subprocess
+import re
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
 from moviepy.editor import *
-from typing import List, Dict
+from moviepy.config import get_setting
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from typing import List, Dict, Optional
 import requests
-from datetime import datetime
+from datetime import datetime, timedelta
+
+class FrameCache:
+    """Memory-bounded LRU cache of decoded RGB frames, shared across thumbnail, contact sheet and cover stages"""
+    
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Return a cached frame (or None), marking it as recently used"""
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+            return frame
+    
+    def put(self, key, frame: np.ndarray):
+        """Store a frame, evicting the least recently used ones to stay under budget"""
+        if frame.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._frames:
+                self.current_bytes -= self._frames.pop(key).nbytes
+            self._frames[key] = frame
+            self.current_bytes += frame.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._frames.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+    
+    def clear(self):
+        """Drop all cached frames"""
+        with self._lock:
+            self._frames.clear()
+            self.current_bytes = 0
 
 class ReelAssembler:
     """Assembles videos, images, and audio into final Instagram reels"""
     
+    # One cache per process so every assembler stage reuses the same decoded frames
+    frame_cache = FrameCache()
+    
     def __init__(self, assets_dir: str = "generated_reels"):
         self.assets_dir = assets_dir
         self.video_dir = f"{assets_dir}/videos"
         self.image_dir = f"{assets_dir}/images"
         self.audio_dir = f"{assets_dir}/audio"
         self.output_dir = f"{assets_dir}/final_reels"
+        self.audio_cache_dir = f"{assets_dir}/audio_cache"
+        self.cover_dir = f"{assets_dir}/covers"
+        self.frame_size = (1080, 1920)
+        
+        # Voiceover preparation settings (Instagram normalizes to about -14 LUFS)
+        self.target_lufs = -14.0
+        self.true_peak = -1.5
+        self.audio_bitrate = "192k"
+        self.audio_sample_rate = 44100
+        self.max_speedup = 1.1  # longest voiceover overrun fitted with atempo before trimming
+        self.daily_prepared_audio = set()  # voiceovers already handled by prepare_daily_audio
     
     def load_reel_spec(self, spec_file: str) -> Dict:
         """Load reel specification from JSON file"""
         with open(spec_file, 'r') as f:
             return json.load(f)
     
-    def assemble_video_focused_reel(self, spec: Dict, video_files: List[str], audio_file: str) -> str:
+    def assemble_video_focused_reel(self, spec: Dict, video_files: List[str], audio_file: str,
+                                    audio_duration: Optional[float] = None) -> str:
         """Assemble a video-focused reel (2 videos + audio)"""
         print(f"🎬 Assembling video-focused reel...")
         
@@ -37,33 +100,19 @@ class ReelAssembler:
         # Concatenate videos
         final_video = concatenate_videoclips(clips, method="compose")
         
-        # Add audio if provided
-        if audio_file and os.path.exists(audio_file):
-            audio = AudioFileClip(audio_file)
-            final_video = final_video.set_audio(audio)
-        
-        # Export
-        output_path = f"{self.output_dir}/reel_{spec['date']}_{spec['reel_number']:02d}.mp4"
-        final_video.write_videofile(
-            output_path,
-            fps=30,
-            codec='libx264',
-            audio_codec='aac',
-            temp_audiofile='temp-audio.m4a',
-            remove_temp=True
-        )
+        # Export, muxing in the prepared voiceover if provided
+        output_path = self.export_reel(final_video, spec, audio_file, audio_duration)
         
         # Clean up
         for clip in clips:
             clip.close()
         final_video.close()
-        if 'audio' in locals():
-            audio.close()
         
         print(f"✅ Video-focused reel saved: {output_path}")
         return output_path
     
-    def assemble_mixed_media_reel(self, spec: Dict, video_files: List[str], image_files: List[str], audio_file: str) -> str:
+    def assemble_mixed_media_reel(self, spec: Dict, video_files: List[str], image_files: List[str], audio_file: str,
+                                  audio_duration: Optional[float] = None) -> str:
         """Assemble a mixed media reel (2 videos + 4-5 images + audio)"""
         print(f"🎨 Assembling mixed media reel...")
         
@@ -91,57 +140,391 @@ class ReelAssembler:
         # Concatenate all clips
         final_video = concatenate_videoclips(clips, method="compose")
         
-        # Add audio
-        if audio_file and os.path.exists(audio_file):
-            audio = AudioFileClip(audio_file)
-            final_video = final_video.set_audio(audio)
-        
-        # Export
-        output_path = f"{self.output_dir}/reel_{spec['date']}_{spec['reel_number']:02d}.mp4"
-        final_video.write_videofile(
-            output_path,
-            fps=30,
-            codec='libx264',
-            audio_codec='aac',
-            temp_audiofile='temp-audio.m4a',
-            remove_temp=True
-        )
+        # Export, muxing in the prepared voiceover if provided
+        output_path = self.export_reel(final_video, spec, audio_file, audio_duration)
         
         # Clean up
         for clip in clips:
             clip.close()
         final_video.close()
-        if 'audio' in locals():
-            audio.close()
         
         print(f"✅ Mixed media reel saved: {output_path}")
         return output_path
     
-    def assemble_reel_from_spec(self, spec_file: str) -> str:
-        """Assemble a reel based on its specification file"""
-        spec = self.load_reel_spec(spec_file)
+    def export_reel(self, final_video, spec: Dict, audio_file: str, audio_duration: Optional[float] = None) -> str:
+        """Render the video track and stream-copy the prepared voiceover into it.
         
-        # Expected file paths based on spec
-        date = spec['date']
-        reel_num = spec['reel_number']
+        `audio_duration` is the footage length from `_footage_duration`, passed by
+        `assemble_reel_from_spec` so the cache key matches `prepare_daily_audio`;
+        it falls back to the rendered clip's duration.
+        """
+        output_path = f"{self.output_dir}/reel_{spec['date']}_{spec['reel_number']:02d}.mp4"
         
-        video_files = [
-            f"{self.video_dir}/reel_{date}_{reel_num:02d}_video1.mp4",
-            f"{self.video_dir}/reel_{date}_{reel_num:02d}_video2.mp4"
-        ]
+        # Where each source clip starts, so cover extraction can seek straight to them
+        segment_starts = [clip.start for clip in getattr(final_video, 'clips', [])]
         
-        image_files = [
-            f"{self.image_dir}/reel_{date}_{reel_num:02d}_img{i}.jpg" 
+        if not (audio_file and os.path.exists(audio_file)):
+            final_video.write_videofile(output_path, fps=30, codec='libx264', audio=False)
+            self._write_segments(output_path, segment_starts)
+            return output_path
+        
+        # Reuse the cached AAC track so the final mux never re-encodes audio.
+        # It is fitted to the footage actually rendered, so both streams end together.
+        if audio_duration is None:
+            audio_duration = final_video.duration
+        prepared_audio = self.prepare_audio(audio_file, audio_duration)
+        silent_path = f"{self.output_dir}/reel_{spec['date']}_{spec['reel_number']:02d}_silent.mp4"
+        final_video.write_videofile(silent_path, fps=30, codec='libx264', audio=False)
+        
+        try:
+            self._run_ffmpeg([
+                "-i", silent_path,
+                "-i", prepared_audio,
+                "-map", "0:v:0",
+                "-map", "1:a:0",
+                "-c", "copy",
+                "-movflags", "+faststart",
+                output_path
+            ])
+        finally:
+            os.remove(silent_path)
+        
+        self._write_segments(output_path, segment_starts)
+        return output_path
+    
+    def prepare_audio(self, audio_file: str, duration: float) -> str:
+        """Normalize a voiceover and fit it to the rendered reel length as a ready-to-mux AAC file.
+        
+        Results are cached by source hash plus preparation parameters, so repeated
+        renders of the same reel skip decoding the voiceover entirely.
+        """
+        if duration <= 0:
+            raise ValueError(f"Cannot fit {audio_file} to a non-positive duration ({duration}s)")
+        
+        # Rounded so the same footage maps to the same cache entry however its length was summed
+        duration = round(float(duration), 3)
+        params = {
+            "duration": duration,
+            "max_speedup": self.max_speedup,
+            "target_lufs": self.target_lufs,
+            "true_peak": self.true_peak,
+            "bitrate": self.audio_bitrate,
+            "sample_rate": self.audio_sample_rate
+        }
+        cache_key = self._audio_cache_key(audio_file, params)
+        cached_path = f"{self.audio_cache_dir}/{cache_key}.m4a"
+        if os.path.exists(cached_path):
+            return cached_path
+        
+        if audio_file in self.daily_prepared_audio:
+            print(f"⚠️ Audio cache miss for {audio_file} ({duration}s) after daily preparation, re-encoding")
+        
+        os.makedirs(self.audio_cache_dir, exist_ok=True)
+        
+        # Speed up slight overruns instead of cutting off the last words
+        source_duration = ffmpeg_parse_infos(audio_file)['duration']
+        tempo = 1.0
+        if source_duration > duration:
+            tempo = min(source_duration / duration, self.max_speedup)
+            if source_duration / tempo > duration:
+                print(f"⚠️ Voiceover {audio_file} runs {source_duration:.1f}s, trimming to {duration:.1f}s")
+        
+        # Single decode: loudness-normalize, fit the tempo, pad short scripts with
+        # silence, fade out the tail and trim to exactly the reel duration
+        fade_start = max(duration - 0.3, 0)
+        audio_filter = f"loudnorm=I={self.target_lufs}:TP={self.true_peak}:LRA=11,"
+        if tempo > 1.0:
+            audio_filter += f"atempo={tempo:.4f},"
+        audio_filter += f"apad,afade=t=out:st={fade_start}:d=0.3"
+        
+        # Write to a temp file first so concurrent workers never see partial output
+        temp_path = f"{self.audio_cache_dir}/{cache_key}.{os.getpid()}_{threading.get_ident()}.tmp.m4a"
+        try:
+            self._run_ffmpeg([
+                "-i", audio_file,
+                "-vn",
+                "-af", audio_filter,
+                "-t", str(duration),
+                "-ar", str(self.audio_sample_rate),
+                "-c:a", "aac",
+                "-b:a", self.audio_bitrate,
+                temp_path
+            ])
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        os.replace(temp_path, cached_path)
+        
+        return cached_path
+    
+    def prepare_daily_audio(self, spec_files: List[str], max_workers: int = 4) -> Dict[str, str]:
+        """Prepare voiceovers for all of a day's reels in parallel.
+        
+        Returns a mapping of spec file to prepared audio path; reels without a
+        voiceover are left out.
+        """
+        jobs = {}
+        for spec_file in spec_files:
+            spec = self.load_reel_spec(spec_file)
+            audio_file = self._voiceover_path(spec)
+            if not os.path.exists(audio_file):
+                continue
+            duration = self._footage_duration(spec)
+            if duration <= 0:
+                print(f"⚠️ No footage yet for {spec_file}, skipping voiceover preparation")
+                continue
+            jobs[spec_file] = (audio_file, duration)
+        
+        print(f"🎙️ Preparing {len(jobs)} voiceovers...")
+        
+        # ffmpeg does the heavy lifting in subprocesses, so threads are enough
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                spec_file: executor.submit(self.prepare_audio, audio_file, duration)
+                for spec_file, (audio_file, duration) in jobs.items()
+            }
+            prepared = {spec_file: future.result() for spec_file, future in futures.items()}
+        
+        self.daily_prepared_audio.update(audio_file for audio_file, _ in jobs.values())
+        
+        print(f"✅ Voiceovers ready in {self.audio_cache_dir}")
+        return prepared
+    
+    def _audio_cache_key(self, audio_file: str, params: Dict) -> str:
+        """Hash the source audio contents together with the preparation parameters"""
+        digest = hashlib.sha256()
+        with open(audio_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        return digest.hexdigest()[:32]
+    
+    def _footage_duration(self, spec: Dict) -> float:
+        """Length of the reel the assembler will render from this spec's source files.
+        
+        Both `prepare_daily_audio` and `assemble_reel_from_spec` use this, so they
+        always agree on the audio cache key.
+        """
+        video_files = self._video_paths(spec)
+        if spec['format_type'] == 'video_focused':
+            segments = [(f, None) for f in video_files]
+        else:
+            # Same order as assemble_mixed_media_reel: video, 1 second per image, video
+            segments = [(video_files[0], None)] + [(f, 1) for f in self._image_paths(spec)] + [(video_files[1], None)]
+        
+        duration = 0.0
+        for path, fixed_duration in segments:
+            if os.path.exists(path):
+                duration += fixed_duration if fixed_duration is not None else ffmpeg_parse_infos(path)['duration']
+        return duration
+    
+    def _video_paths(self, spec: Dict) -> List[str]:
+        """Expected Veo video paths for a reel spec"""
+        return [
+            f"{self.video_dir}/reel_{spec['date']}_{spec['reel_number']:02d}_video{i}.mp4"
+            for i in range(1, 3)
+        ]
+    
+    def _image_paths(self, spec: Dict) -> List[str]:
+        """Expected image paths for a reel spec"""
+        return [
+            f"{self.image_dir}/reel_{spec['date']}_{spec['reel_number']:02d}_img{i}.jpg"
             for i in range(1, 6)
         ]
+    
+    def _voiceover_path(self, spec: Dict) -> str:
+        """Expected raw voiceover path for a reel spec"""
+        return f"{self.audio_dir}/reel_{spec['date']}_{spec['reel_number']:02d}_voiceover.mp3"
+    
+    def get_frame(self, video_file: str, timestamp: float) -> Optional[np.ndarray]:
+        """Decode a single frame at `timestamp` using a fast input seek, via the shared frame cache"""
+        width, height = self.frame_size
+        key = (video_file, os.path.getmtime(video_file), round(timestamp, 3), width, height)
+        frame = self.frame_cache.get(key)
+        if frame is not None:
+            return frame
+        
+        # -ss before -i seeks to the nearest keyframe and decodes only up to the target
+        result = self._run_ffmpeg([
+            "-ss", f"{timestamp:.3f}",
+            "-i", video_file,
+            "-frames:v", "1",
+            "-vf", f"scale={width}:{height}",
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "-"
+        ])
+        if len(result.stdout) < width * height * 3:
+            return None
+        
+        frame = np.frombuffer(result.stdout[:width * height * 3], dtype=np.uint8).reshape(height, width, 3)
+        self.frame_cache.put(key, frame)
+        return frame
+    
+    def get_keyframe_times(self, video_file: str) -> List[float]:
+        """List keyframe timestamps, decoding only the keyframes themselves"""
+        result = self._run_ffmpeg([
+            "-skip_frame", "nokey",
+            "-i", video_file,
+            "-an",
+            "-vf", "showinfo",
+            "-f", "null",
+            "-"
+        ], loglevel="info")
+        return [float(t) for t in re.findall(r"pts_time:([\d.]+)", result.stderr.decode(errors='ignore'))]
+    
+    def get_cover_candidate_times(self, reel_path: str, max_candidates: int = 12) -> List[float]:
+        """Candidate cover timestamps: keyframes plus a moment just after each segment boundary"""
+        times = self.get_keyframe_times(reel_path)
+        
+        duration = None
+        segments_path = self._segments_path(reel_path)
+        if os.path.exists(segments_path):
+            with open(segments_path, 'r') as f:
+                segments = json.load(f)
+            duration = segments.get("duration")
+            # Step past transition frames at the start of each segment
+            times += [start + 0.5 for start in segments.get("segment_starts", [])]
+        
+        if duration:
+            times = [t for t in times if t < duration]
+        
+        # Dedupe near-identical moments, then spread picks evenly across the reel
+        unique_times = sorted({round(t, 1) for t in times})
+        if len(unique_times) > max_candidates:
+            picks = np.linspace(0, len(unique_times) - 1, max_candidates).round().astype(int)
+            unique_times = [unique_times[i] for i in sorted(set(picks))]
+        return unique_times
+    
+    def score_frames(self, frames: List[np.ndarray]) -> np.ndarray:
+        """Score frames for cover suitability in one vectorized pass.
+        
+        Sharpness is the variance of a Laplacian over a downsampled luma plane;
+        brightness is rewarded for sitting near mid-grey rather than crushed or blown out.
+        """
+        # Downsample 4x before scoring: plenty of detail for ranking, 16x less work
+        batch = np.stack([frame[::4, ::4] for frame in frames]).astype(np.float32) / 255.0
+        luma = batch @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        
+        laplacian = (
+            luma[:, :-2, 1:-1] + luma[:, 2:, 1:-1] + luma[:, 1:-1, :-2] + luma[:, 1:-1, 2:]
+            - 4 * luma[:, 1:-1, 1:-1]
+        )
+        sharpness = laplacian.reshape(len(frames), -1).var(axis=1)
+        brightness = luma.reshape(len(frames), -1).mean(axis=1)
+        
+        sharpness_score = sharpness / sharpness.max() if sharpness.max() > 0 else np.zeros_like(sharpness)
+        brightness_score = 1.0 - np.abs(brightness - 0.5) * 2
+        return 0.7 * sharpness_score + 0.3 * brightness_score
+    
+    def extract_cover_frames(self, reel_path: str, max_candidates: int = 12) -> List[Dict]:
+        """Extract candidate cover frames from a final reel, best first"""
+        candidates = []
+        for timestamp in self.get_cover_candidate_times(reel_path, max_candidates):
+            frame = self.get_frame(reel_path, timestamp)
+            if frame is not None:
+                candidates.append({"timestamp": timestamp, "frame": frame})
+        
+        if not candidates:
+            raise ValueError(f"No frames could be decoded from {reel_path}")
+        
+        scores = self.score_frames([candidate["frame"] for candidate in candidates])
+        for candidate, score in zip(candidates, scores):
+            candidate["score"] = float(score)
+        
+        return sorted(candidates, key=lambda candidate: candidate["score"], reverse=True)
+    
+    def create_thumbnail(self, reel_path: str, timestamp: float, width: int = 270) -> Image.Image:
+        """Build a review thumbnail from the (usually already cached) frame at `timestamp`"""
+        frame = self.get_frame(reel_path, timestamp)
+        if frame is None:
+            raise ValueError(f"No frame at {timestamp}s in {reel_path}")
+        height = round(frame.shape[0] * width / frame.shape[1])
+        return Image.fromarray(frame).resize((width, height), Image.BILINEAR)
+    
+    def write_contact_sheet(self, reel_path: str, candidates: List[Dict], columns: int = 4, thumb_width: int = 270) -> str:
+        """Write a grid of candidate frames (best first) for manual review"""
+        if not candidates:
+            raise ValueError(f"No candidate frames to write a contact sheet for {reel_path}")
+        if columns <= 0:
+            raise ValueError(f"Contact sheet needs at least one column, got {columns}")
+        
+        thumbs = [self.create_thumbnail(reel_path, candidate["timestamp"], thumb_width) for candidate in candidates]
+        rows = -(-len(thumbs) // columns)
+        thumb_height = thumbs[0].height
+        
+        sheet = Image.new("RGB", (columns * thumb_width, rows * thumb_height))
+        for i, thumb in enumerate(thumbs):
+            sheet.paste(thumb, ((i % columns) * thumb_width, (i // columns) * thumb_height))
+        
+        os.makedirs(self.cover_dir, exist_ok=True)
+        sheet_path = f"{self.cover_dir}/{self._reel_name(reel_path)}_contact_sheet.jpg"
+        sheet.save(sheet_path, quality=90)
+        return sheet_path
+    
+    def select_cover_frame(self, reel_path: str, max_candidates: int = 12) -> Dict:
+        """Pick the best cover frame for a reel and write the cover, thumbnail and contact sheet"""
+        print(f"🖼️ Selecting cover frame for {reel_path}...")
+        
+        candidates = self.extract_cover_frames(reel_path, max_candidates)
+        best = candidates[0]
+        
+        os.makedirs(self.cover_dir, exist_ok=True)
+        reel_name = self._reel_name(reel_path)
+        cover_path = f"{self.cover_dir}/{reel_name}_cover.jpg"
+        thumbnail_path = f"{self.cover_dir}/{reel_name}_thumb.jpg"
         
-        audio_file = f"{self.audio_dir}/reel_{date}_{reel_num:02d}_voiceover.mp3"
+        Image.fromarray(best["frame"]).save(cover_path, quality=95)
+        self.create_thumbnail(reel_path, best["timestamp"]).save(thumbnail_path, quality=90)
+        sheet_path = self.write_contact_sheet(reel_path, candidates)
+        
+        print(f"✅ Cover frame at {best['timestamp']}s saved: {cover_path}")
+        return {
+            "timestamp": best["timestamp"],
+            "score": best["score"],
+            "cover_path": cover_path,
+            "thumbnail_path": thumbnail_path,
+            "contact_sheet_path": sheet_path
+        }
+    
+    def _write_segments(self, reel_path: str, segment_starts: List[float]):
+        """Write the segment sidecar, taking the duration from the file actually on disk"""
+        duration = ffmpeg_parse_infos(reel_path)['duration']
+        with open(self._segments_path(reel_path), 'w') as f:
+            json.dump({"segment_starts": segment_starts, "duration": duration}, f, indent=2)
+    
+    def _segments_path(self, reel_path: str) -> str:
+        """Sidecar file recording segment boundaries for a final reel"""
+        return f"{os.path.splitext(reel_path)[0]}_segments.json"
+    
+    def _reel_name(self, reel_path: str) -> str:
+        """Base name of a reel file without directory or extension"""
+        return os.path.splitext(os.path.basename(reel_path))[0]
+    
+    def _run_ffmpeg(self, args: List[str], loglevel: str = "error") -> subprocess.CompletedProcess:
+        """Run ffmpeg (the binary MoviePy is configured with), raising on failure"""
+        cmd = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", loglevel] + args
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='ignore').strip()}")
+        return result
+    
+    def assemble_reel_from_spec(self, spec_file: str) -> str:
+        """Assemble a reel based on its specification file"""
+        spec = self.load_reel_spec(spec_file)
+        
+        # Expected file paths based on spec
+        video_files = self._video_paths(spec)
+        image_files = self._image_paths(spec)
+        audio_file = self._voiceover_path(spec)
+        audio_duration = self._footage_duration(spec)
         
         # Assemble based on format type
         if spec['format_type'] == 'video_focused':
-            return self.assemble_video_focused_reel(spec, video_files, audio_file)
+            return self.assemble_video_focused_reel(spec, video_files, audio_file, audio_duration)
         else:
-            return self.assemble_mixed_media_reel(spec, video_files, image_files, audio_file)
+            return self.assemble_mixed_media_reel(spec, video_files, image_files, audio_file, audio_duration)
 
 class PerformanceTracker:
     """Track Instagram reel performance metrics"""
@@ -239,43 +622,137 @@ class PerformanceTracker:
 class ContentCalendar:
     """Manage content planning and optimization"""
     
-    def __init__(self):
-        self.calendar_file = "content_calendar.json"
+    def __init__(self, calendar_file: str = "content_calendar.db", reels_per_day: int = 5,
+                 veo_daily_quota: int = 10, videos_per_reel: int = 2, min_repeat_gap: int = 7,
+                 shrink_repeat_gap: bool = True):
+        self.calendar_file = calendar_file
+        self.legacy_calendar_file = os.path.splitext(calendar_file)[0] + ".json"
+        self.reels_per_day = reels_per_day
+        self.veo_daily_quota = veo_daily_quota  # Veo generations available per day
+        self.videos_per_reel = videos_per_reel  # Veo clips each reel needs
+        self.min_repeat_gap = min_repeat_gap  # days before a sock may be featured again
+        self.shrink_repeat_gap = shrink_repeat_gap  # small catalogs: shorten the gap rather than leave slots empty
         self.load_calendar()
     
     def load_calendar(self):
-        """Load existing calendar data"""
-        try:
-            with open(self.calendar_file, 'r') as f:
-                self.calendar = json.load(f)
-        except FileNotFoundError:
-            self.calendar = {}
+        """Open the calendar store, one row per date, importing the old JSON calendar if present"""
+        self.conn = sqlite3.connect(self.calendar_file)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS calendar_days (date TEXT PRIMARY KEY, plan TEXT NOT NULL)"
+        )
+        self.conn.commit()
+        
+        is_empty = self.conn.execute("SELECT 1 FROM calendar_days LIMIT 1").fetchone() is None
+        if is_empty and os.path.exists(self.legacy_calendar_file):
+            with open(self.legacy_calendar_file, 'r') as f:
+                legacy = json.load(f)
+            # Old format: {"week_<date>": {"<date>": plan, ...}, ...}
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO calendar_days (date, plan) VALUES (?, ?)",
+                    [(date, json.dumps(plan)) for week in legacy.values() for date, plan in week.items()]
+                )
+    
+    def get_day(self, date: str) -> Optional[Dict]:
+        """Look up the plan for a single date"""
+        row = self.conn.execute("SELECT plan FROM calendar_days WHERE date = ?", (date,)).fetchone()
+        return json.loads(row[0]) if row else None
     
-    def save_calendar(self):
-        """Save calendar data"""
-        with open(self.calendar_file, 'w') as f:
-            json.dump(self.calendar, f, indent=2)
+    def get_range(self, start_date: str, end_date: str) -> Dict[str, Dict]:
+        """Get plans for all dates between start_date and end_date (inclusive)"""
+        rows = self.conn.execute(
+            "SELECT date, plan FROM calendar_days WHERE date BETWEEN ? AND ? ORDER BY date",
+            (start_date, end_date)
+        )
+        return {date: json.loads(plan) for date, plan in rows}
     
     def plan_week(self, start_date: str, sock_priorities: List[str] = None):
         """Plan content for a week based on performance insights"""
-        from datetime import datetime, timedelta
+        return self.plan_weeks(start_date, 1, sock_priorities)
+    
+    def plan_weeks(self, start_date: str, weeks: int, sock_priorities: List[str] = None) -> Dict[str, Dict]:
+        """Plan content for several weeks at once, written in a single transaction.
         
+        Content focus and hashtags follow each date's calendar weekday, so a plan
+        starting mid-week still gets "fashion_friday" on Fridays.
+        """
         start = datetime.strptime(start_date, "%Y-%m-%d")
-        week_plan = {}
-        
-        for i in range(7):
-            date = (start + timedelta(days=i)).strftime("%Y-%m-%d")
-            week_plan[date] = {
-                "planned_socks": sock_priorities[:5] if sock_priorities else [],
-                "content_focus": self.get_daily_focus(i),
+        days = [start + timedelta(days=i) for i in range(weeks * 7)]
+        
+        schedule = self.schedule_socks(days, sock_priorities or [])
+        
+        plan = {}
+        for day in days:
+            date = day.strftime("%Y-%m-%d")
+            planned_socks = schedule[date]
+            plan[date] = {
+                "planned_socks": planned_socks,
+                "veo_videos": len(planned_socks) * self.videos_per_reel,
+                "content_focus": self.get_daily_focus(day.weekday()),
                 "posting_time": "10:00 AM",  # Customize based on audience insights
-                "hashtag_strategy": self.get_hashtag_strategy(i)
+                "hashtag_strategy": self.get_hashtag_strategy(day.weekday())
             }
         
-        self.calendar[f"week_{start_date}"] = week_plan
-        self.save_calendar()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO calendar_days (date, plan) VALUES (?, ?)",
+                [(date, json.dumps(day_plan)) for date, day_plan in plan.items()]
+            )
         
-        return week_plan
+        return plan
+    
+    def schedule_socks(self, days: List[datetime], sock_priorities: List[str]) -> Dict[str, List[str]]:
+        """Spread socks across days in priority order.
+        
+        Each day gets as many slots as the Veo quota allows and is filled with the
+        highest-priority socks whose cooldown has ended; a featured sock is held
+        back for min_repeat_gap days, so top priorities recur as often as that allows.
+        If the catalog is too small to fill every slot under that gap, the gap is
+        shortened when shrink_repeat_gap is set, otherwise the extra slots stay empty.
+        """
+        socks = list(dict.fromkeys(sock_priorities))
+        slots_per_day = min(self.reels_per_day, self.veo_daily_quota // self.videos_per_reel, len(socks))
+        if not days or slots_per_day <= 0:
+            return {day.strftime("%Y-%m-%d"): [] for day in days}
+        
+        gap = self.min_repeat_gap
+        max_full_gap = len(socks) // slots_per_day - 1
+        if max_full_gap < gap:
+            if self.shrink_repeat_gap:
+                gap = max_full_gap
+                print(f"⚠️ Only {len(socks)} socks for {slots_per_day} daily slots: "
+                      f"repeat gap shortened from {self.min_repeat_gap} to {gap} days")
+            else:
+                print(f"⚠️ Only {len(socks)} socks for {slots_per_day} daily slots: "
+                      f"keeping the {gap}-day repeat gap, some slots will stay empty")
+        
+        # Seed cooldowns from days already planned just before this range
+        next_eligible = {}
+        history_start = (days[0] - timedelta(days=gap)).strftime("%Y-%m-%d")
+        history_end = (days[0] - timedelta(days=1)).strftime("%Y-%m-%d")
+        for date, day_plan in self.get_range(history_start, history_end).items():
+            day_index = (datetime.strptime(date, "%Y-%m-%d") - days[0]).days
+            for sock in day_plan.get("planned_socks", []):
+                next_eligible[sock] = max(next_eligible.get(sock, 0), day_index + gap + 1)
+        
+        # `ready` holds eligible socks by priority rank; `cooling` holds the rest
+        # by (next eligible day, rank), so each day costs O(slots log catalog)
+        ready = [rank for rank, sock in enumerate(socks) if sock not in next_eligible]
+        cooling = [(next_eligible[sock], rank) for rank, sock in enumerate(socks) if sock in next_eligible]
+        heapq.heapify(ready)
+        heapq.heapify(cooling)
+        
+        schedule = {}
+        for day_index, day in enumerate(days):
+            while cooling and cooling[0][0] <= day_index:
+                heapq.heappush(ready, heapq.heappop(cooling)[1])
+            
+            picked = [heapq.heappop(ready) for _ in range(min(slots_per_day, len(ready)))]
+            for rank in picked:
+                heapq.heappush(cooling, (day_index + gap + 1, rank))
+            schedule[day.strftime("%Y-%m-%d")] = [socks[rank] for rank in picked]
+        
+        return schedule
     
     def get_daily_focus(self, day_of_week: int) -> str:
         """Get content focus based on day of week"""
@@ -316,9 +793,12 @@ if __name__ == "__main__":
     print("🚀 Socks Reels Pipeline Tools Ready!")
     print("\nAvailable functions:")
     print("1. assembler.assemble_reel_from_spec('spec_file.json')")
+    print("   assembler.prepare_daily_audio(['spec_file.json', ...])")
+    print("   assembler.select_cover_frame('final_reels/reel.mp4')")
     print("2. tracker.add_reel_performance(reel_data)")
     print("3. tracker.get_performance_summary()")
     print("4. calendar.plan_week('2025-05-26')")
+    print("   calendar.plan_weeks('2025-05-26', 52, sock_ids)")
     
     # Example workflow
     print("\n📋 Example Daily Workflow:")